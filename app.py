@@ -1,19 +1,24 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from subtitle_processor import process_video, is_already_translated, get_youtube_transcript
+from translator import Translator
+from subtitle_store import SubtitleStore
 import re
-import glob
-import json
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 from job_queue import JobQueue
 
+# subtitle_processor（openai・youtube_transcript_apiを読み込む）は
+# 起動を速くするため、必要になったエンドポイントの中で読み込む
+
 app = Flask(__name__, static_folder='.', static_url_path='')
 CORS(app)
 
 # ジョブキューの初期化
 job_queue = JobQueue()
 
+# 字幕ファイルの保存先
+subtitle_store = SubtitleStore()
+
 def extract_video_id(url):
     """YouTubeのURLからビデオIDを抽出する"""
     patterns = [
@@ -23,30 +28,46 @@ def extract_video_id(url):
     
     for pattern in patterns:
         match = re.search(pattern, url)
-        if match:
+        if match and SubtitleStore.is_valid_key(match.group(1)):
             return match.group(1)
     return None
 
-def get_translated_videos() -> List[Dict]:
+def parse_languages(value) -> Optional[List[str]]:
+    """リクエストで指定された翻訳先言語を検証する
+    Args:
+        value: 言語コードのリスト、またはカンマ区切りの文字列（省略時は日本語のみ）
+    Returns:
+        言語コードのリスト（未対応の言語や不正な形式の場合はNone）
+    """
+    if value is None:
+        return list(Translator.DEFAULT_TARGET_LANGUAGES)
+    if not isinstance(value, (str, list)):
+        return None
+    if not value:
+        return list(Translator.DEFAULT_TARGET_LANGUAGES)
+    if isinstance(value, str):
+        value = value.split(',')
+    languages = [str(lang).strip() for lang in value if str(lang).strip()]
+    if not languages or any(lang not in Translator.LANGUAGE_NAMES for lang in languages):
+        return None
+    return list(dict.fromkeys(languages))
+
+def get_translated_videos(lang: str = 'ja') -> List[Dict]:
     """翻訳済みの動画リストを取得する"""
     videos = []
-    # 翻訳済みの字幕ファイルを検索
-    subtitle_files = glob.glob('subtitles/ja_*.json')
-    
-    for file_path in subtitle_files:
-        video_id = file_path.replace('subtitles/ja_', '').replace('.json', '')
+    # 翻訳済みの字幕ファイルを検索（内容の検証は変更されたファイルのみ）
+    for summary in subtitle_store.list_subtitle_summaries(lang):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                subtitles = json.load(f)
-                # 最初の字幕からタイトルとして使用
-                title = subtitles[0]['text'] if subtitles else '無題'
-                videos.append({
-                    'video_id': video_id,
-                    'title': title,
-                    'subtitle_count': len(subtitles)
-                })
+            first_line = summary['first_line']
+            # 最初の字幕からタイトルとして使用
+            title = first_line['text'] if first_line else '無題'
+            videos.append({
+                'video_id': summary['video_id'],
+                'title': title,
+                'subtitle_count': summary['line_count']
+            })
         except Exception as e:
-            print(f"Error loading {file_path}: {e}")
+            print(f"Error loading {summary['video_id']}: {e}")
             continue
     
     # 字幕数の多い順にソート
@@ -63,10 +84,16 @@ def process():
         video_id = extract_video_id(url)
         if not video_id:
             return jsonify({'error': '有効なYouTube URLではありません'}), 400
+
+        languages = parse_languages(data.get('languages'))
+        if not languages:
+            return jsonify({'error': '未対応の言語が指定されています'}), 400
             
         # 既に処理済みかチェック
-        if is_already_translated(video_id):
+        if all(subtitle_store.has_subtitles(video_id, lang) for lang in languages):
             return jsonify({'message': '既に処理済みです', 'status': 'completed', 'video_id': video_id})
+
+        from subtitle_processor import process_video, get_youtube_transcript
             
         # 字幕が利用可能かチェック
         transcript = get_youtube_transcript(video_id)
@@ -74,7 +101,7 @@ def process():
             return jsonify({'error': '字幕が利用できません'}), 400
             
         # 非同期で処理を開始
-        process_video(video_id)
+        process_video(video_id, languages)
         
         return jsonify({
             'message': '処理を開始しました',
@@ -88,16 +115,18 @@ def process():
 @app.route('/api/transcripts/<video_id>')
 def get_transcripts(video_id):
     try:
-        # 翻訳済み字幕ファイルのパス
-        ja_subtitle_path = f"subtitles/ja_{video_id}.json"
-        
-        if not os.path.exists(ja_subtitle_path):
+        if not SubtitleStore.is_valid_key(video_id):
+            return jsonify({'error': '不正な動画IDです'}), 400
+
+        lang = request.args.get('lang', 'ja')
+        if lang not in Translator.LANGUAGE_NAMES:
+            return jsonify({'error': '未対応の言語です'}), 400
+
+        # 翻訳済み字幕ファイルを読み込む
+        transcripts = subtitle_store.load_subtitles(video_id, lang)
+        if transcripts is None:
             return jsonify({'error': '字幕ファイルが見つかりません'}), 404
             
-        # ファイルを読み込む
-        with open(ja_subtitle_path, 'r', encoding='utf-8') as f:
-            transcripts = json.load(f)
-            
         return jsonify(transcripts)
         
     except Exception as e:
@@ -107,7 +136,10 @@ def get_transcripts(video_id):
 def list_videos():
     """翻訳済みの動画リストを返すAPI"""
     try:
-        videos = get_translated_videos()
+        lang = request.args.get('lang', 'ja')
+        if lang not in Translator.LANGUAGE_NAMES:
+            return jsonify({'error': '未対応の言語です'}), 400
+        videos = get_translated_videos(lang)
         return jsonify(videos)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -117,13 +149,19 @@ def translate_video():
     video_id = request.json.get('video_id')
     if not video_id:
         return jsonify({'error': 'video_id is required'}), 400
+    if not SubtitleStore.is_valid_key(video_id):
+        return jsonify({'error': 'invalid video_id'}), 400
+
+    languages = parse_languages(request.json.get('languages'))
+    if not languages:
+        return jsonify({'error': 'unsupported language'}), 400
 
     # 既に翻訳済みかチェック
-    if is_already_translated(video_id):
+    if all(subtitle_store.has_subtitles(video_id, lang) for lang in languages):
         return jsonify({'status': 'completed', 'message': '既に翻訳済みです'})
 
     # ジョブをキューに追加
-    job_id = job_queue.enqueue(video_id)
+    job_id = job_queue.enqueue(video_id, languages)
     
     return jsonify({
         'job_id': job_id,
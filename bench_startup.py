@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+# 子プロセスで実行する計測コード（毎回まっさらなインタプリタで計測する）
+MEASURE_SCRIPT = """
+import sys
+import json
+import time
+
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/api/videos')
+responded = time.perf_counter()
+heavy_modules = [name for name in %r if name in sys.modules]
+
+# 最初の /api/process で読み込まれる処理系（起動時から後回しにした分）
+import subtitle_processor
+deferred = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (responded - imported) * 1000,
+    'deferred_import_ms': (deferred - responded) * 1000,
+    'status': response.status_code,
+    'heavy_modules': heavy_modules,
+}))
+"""
+
+# リポジトリのルート（app.pyの読み込みとjobs/の作成場所）
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Webプロセスの起動時に読み込まれてほしくないモジュール
+HEAVY_MODULES = ['openai', 'youtube_transcript_api', 'dotenv', 'subtitle_processor']
+
+def measure_once() -> dict:
+    """
+    新しいプロセスでappの読み込み時間と最初のリクエストの応答時間を計測する
+    Returns:
+        計測結果
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', MEASURE_SCRIPT % HEAVY_MODULES],
+        capture_output=True, text=True, check=True, cwd=REPO_DIR
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def run_benchmark(runs: int = 5) -> None:
+    """
+    起動ベンチマークを実行して結果を表示する
+    Args:
+        runs: 計測回数
+    """
+    results = [measure_once() for _ in range(runs)]
+    import_times = [r['import_ms'] for r in results]
+    request_times = [r['first_request_ms'] for r in results]
+    deferred_times = [r['deferred_import_ms'] for r in results]
+
+    print(f"[INFO] 計測回数: {runs}")
+    print(f"[INFO] import app: 中央値 {statistics.median(import_times):.1f} ms（最小 {min(import_times):.1f} ms）")
+    print(f"[INFO] 最初の /api/videos: 中央値 {statistics.median(request_times):.1f} ms（最小 {min(request_times):.1f} ms）")
+    print(f"[INFO] 最初の /api/process で追加される import subtitle_processor: 中央値 {statistics.median(deferred_times):.1f} ms（最小 {min(deferred_times):.1f} ms）")
+    heavy_modules = results[-1]['heavy_modules']
+    if heavy_modules:
+        print(f"[WARNING] 起動時に読み込まれた重いモジュール: {', '.join(heavy_modules)}")
+    else:
+        print("[INFO] 起動時に重いモジュールは読み込まれていません")
+
+if __name__ == "__main__":
+    # 使い方: python bench_startup.py [計測回数]
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
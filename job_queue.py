@@ -23,10 +23,11 @@ class JobQueue:
         """一意のジョブIDを生成"""
         return str(uuid.uuid4())
 
-    def enqueue(self, video_id: str) -> str:
+    def enqueue(self, video_id: str, languages: Optional[List[str]] = None) -> str:
         """新しいジョブをキューに追加
         Args:
             video_id: 翻訳対象の動画ID
+            languages: 翻訳先の言語コードのリスト（省略時は日本語のみ）
         Returns:
             job_id: 生成されたジョブID
         """
@@ -34,6 +35,7 @@ class JobQueue:
         job_data = {
             "job_id": job_id,
             "video_id": video_id,
+            "languages": languages or ["ja"],
             "status": "pending",
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat()
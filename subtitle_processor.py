@@ -5,11 +5,15 @@ import glob
 from datetime import datetime
 from youtube_transcript_api import YouTubeTranscriptApi
 from translator import Translator, TranslationError
+from subtitle_store import SubtitleStore
 from dotenv import load_dotenv
 
 # 環境変数の読み込み
 load_dotenv()
 
+# 字幕ファイルの保存先
+subtitle_store = SubtitleStore()
+
 # OpenAI APIキーの設定
 # openai.api_key = os.getenv('OPENAI_API_KEY')
 
@@ -17,15 +21,14 @@ def get_youtube_transcript(video_id):
     """YouTubeの文字起こしを取得する"""
     try:
         # 既存の英語字幕ファイルをチェック
-        en_subtitle_path = f"subtitles/en_{video_id}.json"
-        if os.path.exists(en_subtitle_path):
+        en_subtitle_path = subtitle_store.get_subtitle_path(video_id, "en")
+        transcript = subtitle_store.load_subtitles(video_id, "en")
+        if transcript is not None:
             print(f"[INFO] 既存の英語字幕を読み込みます: {en_subtitle_path}")
-            with open(en_subtitle_path, "r", encoding="utf-8") as f:
-                transcript = json.load(f)
-                # 既存の字幕もクリーニング
-                for item in transcript:
-                    item['text'] = clean_subtitle_text(item['text'])
-                return transcript
+            # 既存の字幕もクリーニング
+            for item in transcript:
+                item['text'] = clean_subtitle_text(item['text'])
+            return transcript
 
         # 英語字幕を取得
         transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['ja', 'en'])
@@ -36,8 +39,7 @@ def get_youtube_transcript(video_id):
         
         # 字幕を保存
         print(f"[INFO] 英語字幕を保存します: {en_subtitle_path}")
-        with open(en_subtitle_path, "w", encoding="utf-8") as f:
-            json.dump(transcript, f, ensure_ascii=False, indent=2)
+        subtitle_store.save_subtitles(video_id, "en", transcript)
         
         return transcript
     except Exception as e:
@@ -55,34 +57,59 @@ def clean_subtitle_text(text):
     # 前後の空白を除去
     return text.strip()
 
-def translate_text(texts):
-    """ChatGPT APIを使用してテキストを翻訳する"""
+# 翻訳先言語の組み合わせごとに使い回すTranslator
+_translators = {}
+
+def get_translator(target_languages=None):
+    """翻訳先言語の組み合わせごとに共有するTranslatorを取得する
+
+    ワーカーではジョブをまたいで同じTranslator（とOpenAIクライアントのコネクションプール）を使う
+    """
+    key = tuple(dict.fromkeys(target_languages or Translator.DEFAULT_TARGET_LANGUAGES))
+    if key not in _translators:
+        _translators[key] = Translator(target_languages=list(key), store=subtitle_store)
+    return _translators[key]
+
+def translate_text(texts, target_languages=None):
+    """ChatGPT APIを使用してテキストを翻訳する
+
+    全ての翻訳先言語を1回の走査で翻訳し、言語コードをキーとする辞書を返す
+    """
     try:
-        translator = Translator()
-        return translator.translate_subtitles(texts)
+        translator = get_translator(target_languages)
+        return translator.translate_subtitles_multi(texts)
     except TranslationError as e:
         print(f"翻訳に失敗しました: {str(e)}")
         return None
 
-def is_already_translated(video_id):
-    """指定されたvideo_idの翻訳ファイルが存在するかチェックする"""
+def is_already_translated(video_id, lang="ja"):
+    """指定されたvideo_idの検証済みの翻訳ファイルが存在するかチェックする"""
     try:
-        # 翻訳済みファイルのパターンを作成
-        pattern = f"subtitles/ja_{video_id}.json"
-        return os.path.exists(pattern)
+        return subtitle_store.has_subtitles(video_id, lang)
     except Exception as e:
         print(f"ファイルチェックに失敗しました: {str(e)}")
         return False
 
-def process_video(video_id):
+def process_video(video_id, target_languages=None):
+    """字幕を取得し、指定された全言語に翻訳して保存する
+
+    戻り値は言語コードをキーとする翻訳済み字幕データ
+    """
     try:
-        print(f"[INFO] 動画ID {video_id} の処理を開始します")
-        
-        if is_already_translated(video_id):
-            print(f"[INFO] 動画ID {video_id} は既に処理済みです")
+        target_languages = list(dict.fromkeys(target_languages or Translator.DEFAULT_TARGET_LANGUAGES))
+        print(f"[INFO] 動画ID {video_id} の処理を開始します（翻訳先: {', '.join(target_languages)}）")
+
+        results = {}
+        for lang in target_languages:
             # 翻訳済みファイルを読み込んで返す
-            with open(f"subtitles/ja_{video_id}.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            subtitles = subtitle_store.load_subtitles(video_id, lang)
+            if subtitles is not None:
+                print(f"[INFO] 動画ID {video_id} は {lang} で既に処理済みです")
+                results[lang] = subtitles
+
+        missing_languages = [lang for lang in target_languages if lang not in results]
+        if not missing_languages:
+            return results
 
         # 字幕を取得
         print(f"[INFO] 字幕データの取得を開始します")
@@ -96,21 +123,22 @@ def process_video(video_id):
 
         # 翻訳を実行
         print("[INFO] 翻訳処理を開始します")
-        translated_data = translate_text(transcript)
+        translated_data = translate_text(transcript, missing_languages)
         if not translated_data:
             print("[ERROR] 翻訳処理に失敗しました")
             return
 
-        print(f"[INFO] {len(translated_data)} 件の字幕を翻訳しました")
-        print(f"[DEBUG] 最初の翻訳結果: {translated_data[0]}")
-        
-        # 翻訳結果を保存
-        ja_subtitle_path = f"subtitles/ja_{video_id}.json"
-        print(f"[INFO] 翻訳結果を保存します: {ja_subtitle_path}")
-        with open(ja_subtitle_path, "w", encoding="utf-8") as f:
-            json.dump(translated_data, f, ensure_ascii=False, indent=2)
+        for lang, subtitles in translated_data.items():
+            print(f"[INFO] {len(subtitles)} 件の字幕を翻訳しました ({lang})")
+            print(f"[DEBUG] 最初の翻訳結果: {subtitles[0]}")
+
+            # 翻訳結果を保存
+            subtitle_path = subtitle_store.get_subtitle_path(video_id, lang)
+            print(f"[INFO] 翻訳結果を保存します: {subtitle_path}")
+            subtitle_store.save_subtitles(video_id, lang, subtitles)
 
-        return translated_data
+        results.update(translated_data)
+        return results
 
     except Exception as e:
         print(f"[ERROR] 処理に失敗しました: {str(e)}")
@@ -0,0 +1,368 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import tempfile
+from typing import List, Dict, Optional, Iterator, Any, Tuple
+
+class SubtitleStore:
+    """字幕ファイルと翻訳キャッシュの保存先を管理するクラス
+
+    ファイルは言語ごと・キーの先頭文字ごとのディレクトリに分けて保存し、
+    一時ファイルへの書き込み + fsync + rename で常に完全なファイルだけが見えるようにする。
+    各ファイルにはスキーマバージョン・行数・チェックサムのヘッダを持たせ、
+    読み込み時に検証できなかったファイルは存在しないものとして扱う。
+
+    レイアウト:
+        <base_dir>/<lang>/<video_idの先頭2文字>/<video_id>.json
+        <base_dir>/translations/<lang>/<ハッシュの先頭2文字>/<ハッシュ>.json
+    """
+    SCHEMA_VERSION = 1
+    SHARD_PREFIX_LENGTH = 2
+    TRANSLATION_DIR = "translations"
+    # 旧レイアウト（subtitles/<lang>_<video_id>.json）のファイル名
+    LEGACY_SUBTITLE_PATTERN = re.compile(r'^([a-z]{2})_(.+)\.json$')
+    # 旧レイアウト（subtitles/translations/[<lang>_]<hash>.txt）のファイル名
+    LEGACY_TRANSLATION_PATTERN = re.compile(r'^(?:([a-z]{2})_)?([0-9a-f]{32})\.txt$')
+    # パスに使ってよいキー（動画ID・ハッシュ値・言語コード）
+    KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+    def __init__(self, base_dir: str = "subtitles"):
+        """
+        SubtitleStoreクラスの初期化
+        Args:
+            base_dir: 保存先のルートディレクトリ
+        """
+        self.base_dir = base_dir
+        # 検証済みの字幕ファイルの概要（パス -> ((mtime_ns, サイズ), 概要)）
+        self._summaries: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+    @classmethod
+    def is_valid_key(cls, key: Any) -> bool:
+        """
+        パスの一部として使える安全なキーかチェックする
+        Args:
+            key: 動画ID・ハッシュ値・言語コード
+        Returns:
+            英数字・ハイフン・アンダースコアのみからなる場合はTrue
+        """
+        return isinstance(key, str) and cls.KEY_PATTERN.match(key) is not None
+
+    def _check_keys(self, *keys: str) -> None:
+        """
+        パスに使うキーを検証する
+        Args:
+            keys: 検証するキー
+        Raises:
+            ValueError: 不正なキーが含まれる場合
+        """
+        for key in keys:
+            if not self.is_valid_key(key):
+                raise ValueError(f"不正なキーです: {key!r}")
+
+    def _shard(self, key: str) -> str:
+        """
+        キーからシャードのディレクトリ名を取得する
+        Args:
+            key: 動画IDまたはチャンクのハッシュ値
+        Returns:
+            シャードのディレクトリ名
+        """
+        return key[:self.SHARD_PREFIX_LENGTH].ljust(self.SHARD_PREFIX_LENGTH, '_')
+
+    def get_subtitle_path(self, video_id: str, lang: str) -> str:
+        """
+        字幕ファイルのパスを取得する
+        Args:
+            video_id: 動画ID
+            lang: 字幕の言語コード
+        Returns:
+            字幕ファイルのパス
+        Raises:
+            ValueError: 動画IDまたは言語コードが不正な場合
+        """
+        self._check_keys(video_id, lang)
+        return os.path.join(self.base_dir, lang, self._shard(video_id), f"{video_id}.json")
+
+    def get_translation_path(self, chunk_hash: str, lang: str) -> str:
+        """
+        チャンク翻訳キャッシュのパスを取得する
+        Args:
+            chunk_hash: チャンクのハッシュ値
+            lang: 翻訳先の言語コード
+        Returns:
+            翻訳キャッシュのパス
+        Raises:
+            ValueError: ハッシュ値または言語コードが不正な場合
+        """
+        self._check_keys(chunk_hash, lang)
+        return os.path.join(self.base_dir, self.TRANSLATION_DIR, lang, self._shard(chunk_hash), f"{chunk_hash}.json")
+
+    def _checksum(self, lines: List[Any]) -> str:
+        """
+        データのチェックサムを計算する
+        Args:
+            lines: チェックサムを計算するデータ
+        Returns:
+            SHA-256のチェックサム
+        """
+        payload = json.dumps(lines, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _write(self, path: str, lines: List[Any]) -> None:
+        """
+        ヘッダ付きのデータをアトミックに書き込む
+        Args:
+            path: 書き込み先のパス
+            lines: 書き込むデータ
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        document = {
+            'schema_version': self.SCHEMA_VERSION,
+            'line_count': len(lines),
+            'checksum': self._checksum(lines),
+            'lines': lines
+        }
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            # 次回の参照時に新しい内容で検証し直す
+            self._summaries.pop(path, None)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        # renameを永続化するためにディレクトリもfsyncする（未対応の環境では無視）
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    def _read(self, path: str) -> Optional[List[Any]]:
+        """
+        ヘッダを検証してデータを読み込む
+        Args:
+            path: 読み込むファイルのパス
+        Returns:
+            データのリスト、存在しないか検証に失敗した場合はNone
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] 読み込めないファイルを無視します: {path} ({e})")
+            return None
+
+        if not isinstance(document, dict) or document.get('schema_version') != self.SCHEMA_VERSION:
+            print(f"[WARNING] 未対応のスキーマのファイルを無視します: {path}")
+            return None
+        lines = document.get('lines')
+        if (not isinstance(lines, list)
+                or document.get('line_count') != len(lines)
+                or document.get('checksum') != self._checksum(lines)):
+            print(f"[WARNING] 検証に失敗したファイルを無視します: {path}")
+            return None
+        return lines
+
+    def _summary(self, path: str) -> Optional[Dict]:
+        """
+        ファイルの概要（行数・最初の行）を取得する
+
+        mtimeとサイズが前回の検証時から変わっていなければ記録済みの概要を返し、
+        ファイルは読まない。変わっていた場合だけ全体を読み込んでチェックサムを検証する。
+        そのため存在確認や一覧はstat 1回で済むが、mtimeもサイズも変えずに
+        外部から書き換えられたファイルの破損は検出できない（配信時のload_subtitlesでは常に検証する）。
+        Args:
+            path: ファイルのパス
+        Returns:
+            ファイルの概要、存在しないか検証に失敗した場合はNone
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._summaries.pop(path, None)
+            return None
+        cached = self._summaries.get(path)
+        if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+
+        lines = self._read(path)
+        if lines is None:
+            self._summaries.pop(path, None)
+            return None
+        summary = {
+            'line_count': len(lines),
+            'first_line': lines[0] if lines else None
+        }
+        self._summaries[path] = ((stat.st_mtime_ns, stat.st_size), summary)
+        return summary
+
+    def load_subtitles(self, video_id: str, lang: str) -> Optional[List[Dict]]:
+        """
+        字幕データを読み込む
+        Args:
+            video_id: 動画ID
+            lang: 字幕の言語コード
+        Returns:
+            字幕データのリスト、存在しない場合はNone
+        """
+        return self._read(self.get_subtitle_path(video_id, lang))
+
+    def save_subtitles(self, video_id: str, lang: str, subtitles: List[Dict]) -> None:
+        """
+        字幕データを保存する
+        Args:
+            video_id: 動画ID
+            lang: 字幕の言語コード
+            subtitles: 保存する字幕データのリスト
+        """
+        self._write(self.get_subtitle_path(video_id, lang), subtitles)
+
+    def has_subtitles(self, video_id: str, lang: str) -> bool:
+        """
+        完全な字幕データが保存されているかチェックする
+
+        ファイルのチェックサム検証は初回と変更時のみ行う（詳細は_summaryを参照）
+        Args:
+            video_id: 動画ID
+            lang: 字幕の言語コード
+        Returns:
+            検証済みの字幕データが存在する場合はTrue
+        """
+        return self._summary(self.get_subtitle_path(video_id, lang)) is not None
+
+    def list_subtitle_summaries(self, lang: str) -> Iterator[Dict]:
+        """
+        指定された言語の検証済みの字幕の概要を列挙する
+
+        各ファイルはstatのみで、読み込みと検証は初回と変更時だけ行う（詳細は_summaryを参照）。
+        statはファイル数に比例するが、チェックサム計算は変更されたファイル分で済む
+        Args:
+            lang: 字幕の言語コード
+        Returns:
+            video_id・line_count・first_lineを持つ辞書のイテレータ
+        """
+        for video_id in self.list_video_ids(lang):
+            summary = self._summary(self.get_subtitle_path(video_id, lang))
+            if summary is not None:
+                yield dict(summary, video_id=video_id)
+
+    def list_video_ids(self, lang: str) -> Iterator[str]:
+        """
+        指定された言語の字幕が保存されている動画IDを列挙する
+        Args:
+            lang: 字幕の言語コード
+        Returns:
+            動画IDのイテレータ
+        """
+        self._check_keys(lang)
+        lang_dir = os.path.join(self.base_dir, lang)
+        if not os.path.isdir(lang_dir):
+            return
+        with os.scandir(lang_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        video_id = entry.name[:-len('.json')]
+                        if entry.name.endswith('.json') and self.is_valid_key(video_id):
+                            yield video_id
+
+    def load_translation(self, chunk_hash: str, lang: str) -> Optional[List[str]]:
+        """
+        保存済みのチャンク翻訳を読み込む
+        Args:
+            chunk_hash: チャンクのハッシュ値
+            lang: 翻訳先の言語コード
+        Returns:
+            翻訳テキストのリスト、存在しない場合はNone
+        """
+        return self._read(self.get_translation_path(chunk_hash, lang))
+
+    def save_translation(self, chunk_hash: str, lang: str, translations: List[str]) -> None:
+        """
+        チャンク翻訳を保存する
+        Args:
+            chunk_hash: チャンクのハッシュ値
+            lang: 翻訳先の言語コード
+            translations: 翻訳テキストのリスト
+        """
+        self._write(self.get_translation_path(chunk_hash, lang), translations)
+
+    def migrate_flat_layout(self) -> int:
+        """
+        旧レイアウトのファイルを現在のレイアウトに移行する
+
+        移行先に検証済みのファイルがある場合は上書きしない。
+        移行が完了した旧ファイルは削除する。
+        Returns:
+            移行したファイル数
+        """
+        migrated = 0
+
+        if os.path.isdir(self.base_dir):
+            for name in sorted(os.listdir(self.base_dir)):
+                path = os.path.join(self.base_dir, name)
+                match = self.LEGACY_SUBTITLE_PATTERN.match(name)
+                if not match or not os.path.isfile(path):
+                    continue
+                lang, video_id = match.groups()
+                if not self.is_valid_key(video_id):
+                    print(f"[WARNING] 不正な動画IDのため移行をスキップします: {path}")
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        subtitles = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[WARNING] 読み込めないため移行をスキップします: {path} ({e})")
+                    continue
+                if not isinstance(subtitles, list):
+                    print(f"[WARNING] 形式が不正なため移行をスキップします: {path}")
+                    continue
+                if not self.has_subtitles(video_id, lang):
+                    self.save_subtitles(video_id, lang, subtitles)
+                os.remove(path)
+                migrated += 1
+
+        translation_dir = os.path.join(self.base_dir, self.TRANSLATION_DIR)
+        if os.path.isdir(translation_dir):
+            for name in sorted(os.listdir(translation_dir)):
+                path = os.path.join(translation_dir, name)
+                match = self.LEGACY_TRANSLATION_PATTERN.match(name)
+                if not match or not os.path.isfile(path):
+                    continue
+                # 言語コードのないキャッシュは日本語
+                lang, chunk_hash = match.group(1) or 'ja', match.group(2)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        translations = [line.strip() for line in f.readlines()]
+                except (OSError, ValueError) as e:
+                    print(f"[WARNING] 読み込めないため移行をスキップします: {path} ({e})")
+                    continue
+                if self.load_translation(chunk_hash, lang) is None:
+                    self.save_translation(chunk_hash, lang, translations)
+                os.remove(path)
+                migrated += 1
+
+        return migrated
+
+if __name__ == "__main__":
+    # 使い方: python subtitle_store.py [base_dir]
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else "subtitles"
+    count = SubtitleStore(base_dir).migrate_flat_layout()
+    print(f"[INFO] {count} 件のファイルを移行しました")
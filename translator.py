@@ -1,37 +1,95 @@
 import json
-import os
-import openai
+import re
 import hashlib
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Any
+from subtitle_store import SubtitleStore
+
+# プロセス内で共有するOpenAIクライアント（get_shared_clientで初期化）
+_shared_client = None
 
 class TranslationError(Exception):
     """翻訳処理中のエラーを表すカスタム例外"""
     pass
 
+def get_shared_client() -> Any:
+    """
+    プロセス内で共有するOpenAIクライアントを取得する
+
+    openaiは初回呼び出し時に読み込む。クライアントを使い回すことで
+    ジョブをまたいでHTTPコネクションプールが再利用される。
+    Returns:
+        OpenAIクライアント
+    """
+    global _shared_client
+    if _shared_client is None:
+        import openai
+        _shared_client = openai.OpenAI()
+    return _shared_client
+
 class Translator:
     # クラス定数
     DEFAULT_CHUNK_SIZE = 25
     DEFAULT_MODEL = "gpt-4o"
+    DEFAULT_TARGET_LANGUAGES = ["ja"]
+    # 対応する翻訳先言語（言語コード: プロンプトで使う言語名）
+    LANGUAGE_NAMES = {
+        "ja": "日本語",
+        "zh": "中国語",
+        "ko": "韓国語",
+        "fr": "フランス語",
+        "de": "ドイツ語",
+        "es": "スペイン語",
+    }
+    # 句点・読点で分割する言語の句読点（句点, 読点）
+    CJK_PUNCTUATION = {
+        "ja": ("。", "、"),
+        "zh": ("。", "，"),
+    }
     SYSTEM_PROMPT = """
-英語のテキストを日本語に翻訳してください。
+英語のテキストを{language}に翻訳してください。
+入力は複数の文が連結されています。
+各文はピリオドで区切られています。
+できるだけ自然な{language}になるように翻訳してください。
+"""
+    MULTI_SYSTEM_PROMPT = """
+英語のテキストを次の言語にそれぞれ翻訳してください: {languages}
 入力は複数の文が連結されています。
 各文はピリオドで区切られています。
-できるだけ自然な日本語になるように翻訳してください。
+それぞれできるだけ自然な文章になるように翻訳してください。
+結果は言語コードをキー、翻訳文を値とするJSONオブジェクトで返してください。
+例: {example}
 """
-    TRANSLATION_DIR = "subtitles/translations"
 
-    def __init__(self, api_key: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    def __init__(self, api_key: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 target_languages: Optional[List[str]] = None, store: Optional[SubtitleStore] = None,
+                 client: Optional[Any] = None):
         """
         Translatorクラスの初期化
         Args:
             api_key: OpenAI APIキー（省略時は環境変数から読み込み）
             chunk_size: 1チャンクあたりの字幕数
+            target_languages: 翻訳先の言語コードのリスト（省略時は日本語のみ）
+            store: 翻訳キャッシュの保存先（省略時は既定のSubtitleStore）
+            client: 使用するOpenAIクライアント（省略時はプロセス内の共有クライアント）
+        Raises:
+            TranslationError: 未対応の言語が指定された場合
         """
-        if api_key:
-            openai.api_key = api_key
-        self.client = openai.OpenAI()
+        target_languages = list(target_languages or self.DEFAULT_TARGET_LANGUAGES)
+        unsupported = [lang for lang in target_languages if lang not in self.LANGUAGE_NAMES]
+        if unsupported:
+            raise TranslationError(f"未対応の言語です: {', '.join(unsupported)}")
+
+        if client is not None:
+            self.client = client
+        elif api_key:
+            import openai
+            self.client = openai.OpenAI(api_key=api_key)
+        else:
+            self.client = get_shared_client()
         self.chunk_size = chunk_size
-        os.makedirs(self.TRANSLATION_DIR, exist_ok=True)
+        # 重複を除きつつ指定順を保持する
+        self.target_languages = list(dict.fromkeys(target_languages))
+        self.store = store or SubtitleStore()
 
     def _get_chunk_hash(self, chunk: List[Dict]) -> str:
         """
@@ -44,40 +102,26 @@ class Translator:
         chunk_text = json.dumps([item['text'] for item in chunk], sort_keys=True)
         return hashlib.md5(chunk_text.encode()).hexdigest()
 
-    def _get_translation_path(self, chunk_hash: str) -> str:
-        """
-        翻訳ファイルのパスを取得する
-        Args:
-            chunk_hash: チャンクのハッシュ値
-        Returns:
-            翻訳ファイルのパス
-        """
-        return os.path.join(self.TRANSLATION_DIR, f"{chunk_hash}.txt")
-
-    def _load_translation(self, chunk_hash: str) -> Optional[List[str]]:
+    def _load_translation(self, chunk_hash: str, lang: str) -> Optional[List[str]]:
         """
         保存済みの翻訳を読み込む
         Args:
             chunk_hash: チャンクのハッシュ値
+            lang: 翻訳先の言語コード
         Returns:
             翻訳テキストのリスト、存在しない場合はNone
         """
-        translation_path = self._get_translation_path(chunk_hash)
-        if os.path.exists(translation_path):
-            with open(translation_path, 'r', encoding='utf-8') as f:
-                return [line.strip() for line in f.readlines()]
-        return None
+        return self.store.load_translation(chunk_hash, lang)
 
-    def _save_translation(self, chunk_hash: str, translations: List[str]) -> None:
+    def _save_translation(self, chunk_hash: str, lang: str, translations: List[str]) -> None:
         """
         翻訳をファイルに保存する
         Args:
             chunk_hash: チャンクのハッシュ値
+            lang: 翻訳先の言語コード
             translations: 翻訳テキストのリスト
         """
-        translation_path = self._get_translation_path(chunk_hash)
-        with open(translation_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(translations))
+        self.store.save_translation(chunk_hash, lang, translations)
 
     def _chunk_subtitles(self, subtitles: List[Dict]) -> List[List[Dict]]:
         """
@@ -89,22 +133,32 @@ class Translator:
         """
         return [subtitles[i:i + self.chunk_size] for i in range(0, len(subtitles), self.chunk_size)]
 
-    def _split_by_punctuation(self, text: str) -> List[str]:
+    def _split_by_punctuation(self, text: str, lang: str = "ja") -> List[str]:
         """
         テキストを句読点で分割する
         Args:
             text: 分割するテキスト
+            lang: テキストの言語コード
         Returns:
             分割されたテキストのリスト
         """
+        if lang not in self.CJK_PUNCTUATION:
+            # 空白区切りの言語は文末記号・カンマの後ろで分割する
+            sentences = []
+            for sentence in re.split(r'(?<=[.!?])\s+', text):
+                parts = [p.strip() for p in re.split(r'(?<=,)\s+', sentence)]
+                sentences.extend(p for p in parts if p)
+            return sentences
+
+        period, comma = self.CJK_PUNCTUATION[lang]
         sentences = []
-        for sentence in text.split('。'):
+        for sentence in text.split(period):
             if not sentence.strip():
                 continue
-            parts = [p.strip() for p in sentence.split('、')]
-            parts = [(p + '、') for p in parts if p]
+            parts = [p.strip() for p in sentence.split(comma)]
+            parts = [(p + comma) for p in parts if p]
             if parts:
-                parts[-1] = parts[-1].rstrip('、') + '。'
+                parts[-1] = parts[-1].rstrip(comma) + period
                 sentences.extend(parts)
         return sentences
 
@@ -124,37 +178,67 @@ class Translator:
             texts.append(text)
         return ' '.join(texts)
 
-    def _translate_text(self, text: str) -> str:
+    def _translate_text(self, text: str, languages: List[str]) -> Dict[str, str]:
         """
-        テキストを翻訳する
+        テキストを1回のAPIリクエストで指定された全言語に翻訳する
         Args:
             text: 翻訳するテキスト
+            languages: 翻訳先の言語コードのリスト
         Returns:
-            翻訳されたテキスト
+            言語コードをキーとする翻訳されたテキスト
         Raises:
             TranslationError: 翻訳APIでエラーが発生した場合
         """
         try:
+            if len(languages) == 1:
+                lang = languages[0]
+                response = self.client.chat.completions.create(
+                    model=self.DEFAULT_MODEL,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPT.format(language=self.LANGUAGE_NAMES[lang])},
+                        {"role": "user", "content": text}
+                    ]
+                )
+                return {lang: response.choices[0].message.content.strip()}
+
+            # 複数言語の場合は構造化されたJSONで一度に受け取る
+            language_list = "、".join(f"{self.LANGUAGE_NAMES[lang]}（{lang}）" for lang in languages)
+            example = json.dumps({lang: "..." for lang in languages})
             response = self.client.chat.completions.create(
                 model=self.DEFAULT_MODEL,
+                response_format={"type": "json_object"},
                 messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
+                    {"role": "system", "content": self.MULTI_SYSTEM_PROMPT.format(languages=language_list, example=example)},
                     {"role": "user", "content": text}
                 ]
             )
-            return response.choices[0].message.content.strip()
+            result = json.loads(response.choices[0].message.content)
+            if not isinstance(result, dict):
+                raise ValueError("JSONオブジェクトではない応答を受け取りました")
+            translated = {}
+            for lang in languages:
+                value = result.get(lang)
+                # 文のリストで返された場合は連結する。それ以外の形式は欠落として扱う
+                if isinstance(value, list) and all(isinstance(v, str) for v in value):
+                    separator = '' if lang in self.CJK_PUNCTUATION else ' '
+                    value = separator.join(v.strip() for v in value)
+                if isinstance(value, str) and value.strip():
+                    translated[lang] = value.strip()
+            return translated
         except Exception as e:
             raise TranslationError(f"翻訳APIエラー: {str(e)}")
 
-    def _adjust_translated_parts(self, translated_parts: List[str], chunk_size: int) -> List[str]:
+    def _adjust_translated_parts(self, translated_parts: List[str], chunk_size: int, lang: str = "ja") -> List[str]:
         """
         翻訳結果を元のチャンクサイズに調整する
         Args:
             translated_parts: 調整する翻訳パーツ
             chunk_size: 目標のチャンクサイズ
+            lang: 翻訳パーツの言語コード
         Returns:
             調整された翻訳パーツ
         """
+        separator = '' if lang in self.CJK_PUNCTUATION else ' '
         if len(translated_parts) > chunk_size:
             parts_per_chunk = len(translated_parts) / chunk_size
             adjusted_parts = []
@@ -163,81 +247,106 @@ class Translator:
             for i, part in enumerate(translated_parts):
                 current_parts.append(part)
                 if (i + 1) / parts_per_chunk >= len(adjusted_parts) + 1:
-                    adjusted_parts.append(''.join(current_parts))
+                    adjusted_parts.append(separator.join(current_parts))
                     current_parts = []
             
             if current_parts:
-                adjusted_parts.append(''.join(current_parts))
+                adjusted_parts.append(separator.join(current_parts))
             
             return adjusted_parts[:chunk_size]
         elif len(translated_parts) < chunk_size:
             return translated_parts + [''] * (chunk_size - len(translated_parts))
         return translated_parts
 
-    def _process_chunk(self, chunk: List[Dict]) -> List[str]:
+    def _process_chunk(self, chunk: List[Dict]) -> Dict[str, List[str]]:
         """
-        1つのチャンクを処理する
+        1つのチャンクを全ての翻訳先言語について処理する
         Args:
             chunk: 処理する字幕チャンク
         Returns:
-            翻訳されたテキストのリスト
+            言語コードをキーとする翻訳されたテキストのリスト
         """
-        try:
-            chunk_hash = self._get_chunk_hash(chunk)
-            cached_translation = self._load_translation(chunk_hash)
-            
+        chunk_hash = self._get_chunk_hash(chunk)
+        results = {}
+        missing_languages = []
+        for lang in self.target_languages:
+            cached_translation = self._load_translation(chunk_hash, lang)
             if cached_translation:
-                print(f"[INFO] キャッシュされた翻訳を使用します")
-                return cached_translation
-            
+                print(f"[INFO] キャッシュされた翻訳を使用します ({lang})")
+                results[lang] = cached_translation
+            else:
+                missing_languages.append(lang)
+
+        if not missing_languages:
+            return results
+
+        try:
             combined_text = self._prepare_chunk_text(chunk)
-            translated_text = self._translate_text(combined_text)
-            translated_parts = self._split_by_punctuation(translated_text)
-            adjusted_parts = self._adjust_translated_parts(translated_parts, len(chunk))
-            
-            self._save_translation(chunk_hash, adjusted_parts)
-            return adjusted_parts
-            
+            translated_texts = self._translate_text(combined_text, missing_languages)
         except Exception as e:
             print(f"チャンク処理エラー: {e}")
-            return [''] * len(chunk)
+            translated_texts = {}
 
-    def translate_subtitles(self, subtitles: List[Dict]) -> List[Dict]:
+        for lang in missing_languages:
+            if lang not in translated_texts:
+                print(f"[WARNING] {lang} の翻訳結果がありません")
+                results[lang] = [''] * len(chunk)
+                continue
+            translated_parts = self._split_by_punctuation(translated_texts[lang], lang)
+            adjusted_parts = self._adjust_translated_parts(translated_parts, len(chunk), lang)
+            self._save_translation(chunk_hash, lang, adjusted_parts)
+            results[lang] = adjusted_parts
+        return results
+
+    def translate_subtitles_multi(self, subtitles: List[Dict]) -> Dict[str, List[Dict]]:
         """
-        字幕データを翻訳する
+        字幕データを全ての翻訳先言語へ1回の走査で翻訳する
         Args:
             subtitles: 翻訳する字幕データのリスト
         Returns:
-            翻訳された字幕データのリスト
+            言語コードをキーとする翻訳された字幕データのリスト
         Raises:
             TranslationError: 翻訳処理中にエラーが発生した場合
         """
         try:
-            print("[INFO] 翻訳処理を開始します")
+            print(f"[INFO] 翻訳処理を開始します（翻訳先: {', '.join(self.target_languages)}）")
             chunks = self._chunk_subtitles(subtitles)
             print(f"[INFO] 字幕データを {len(chunks)} チャンクに分割しました（1チャンク {len(chunks[0])} 件）")
             
-            translated_subtitles = []
+            translated_subtitles = {lang: [] for lang in self.target_languages}
             for i, chunk in enumerate(chunks, 1):
                 print(f"[INFO] チャンク {i}/{len(chunks)} を処理中... ({len(chunk)} 件)")
                 translated_texts = self._process_chunk(chunk)
                 
                 # 翻訳テキストと元のタイミング情報を組み合わせる
-                for item, translated_text in zip(chunk, translated_texts):
-                    translated_subtitles.append({
-                        'start': item['start'],
-                        'duration': item['duration'],
-                        'text': translated_text
-                    })
+                for lang, texts in translated_texts.items():
+                    for item, translated_text in zip(chunk, texts):
+                        translated_subtitles[lang].append({
+                            'start': item['start'],
+                            'duration': item['duration'],
+                            'text': translated_text
+                        })
                 
                 print(f"[INFO] チャンク {i} の翻訳が完了しました")
             
-            print(f"[INFO] 全ての翻訳が完了しました（合計 {len(translated_subtitles)} 件）")
+            print(f"[INFO] 全ての翻訳が完了しました（合計 {len(subtitles)} 件 x {len(self.target_languages)} 言語）")
             return translated_subtitles
                 
         except Exception as e:
             raise TranslationError(f"翻訳処理エラー: {str(e)}")
 
+    def translate_subtitles(self, subtitles: List[Dict]) -> List[Dict]:
+        """
+        字幕データを最初の翻訳先言語に翻訳する
+        Args:
+            subtitles: 翻訳する字幕データのリスト
+        Returns:
+            翻訳された字幕データのリスト
+        Raises:
+            TranslationError: 翻訳処理中にエラーが発生した場合
+        """
+        return self.translate_subtitles_multi(subtitles)[self.target_languages[0]]
+
 if __name__ == "__main__":
     # テスト用のサンプルデータ
     sample_subtitles = [
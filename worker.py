@@ -1,6 +1,6 @@
 import time
 from job_queue import JobQueue
-from subtitle_processor import process_video
+from subtitle_processor import process_video, get_translator
 
 def run_worker(sleep_interval: int = 5):
     """ワーカープロセスのメインループ
@@ -8,6 +8,9 @@ def run_worker(sleep_interval: int = 5):
         sleep_interval: ジョブがない場合の待機時間（秒）
     """
     job_queue = JobQueue()
+
+    # ジョブ間で使い回すTranslator（とOpenAIクライアント）を先に作成しておく
+    get_translator()
     
     print("[INFO] ワーカープロセスを開始します")
     
@@ -21,15 +24,17 @@ def run_worker(sleep_interval: int = 5):
             
             job_id = job["job_id"]
             video_id = job["video_id"]
+            # 言語指定のない古いジョブは日本語のみ
+            languages = job.get("languages", ["ja"])
             
-            print(f"[INFO] ジョブを開始します: {job_id} (video_id: {video_id})")
+            print(f"[INFO] ジョブを開始します: {job_id} (video_id: {video_id}, languages: {', '.join(languages)})")
             
             # ジョブを処理中に更新
             job_queue.update_job_status(job_id, "processing")
             
             # 翻訳処理を実行
             try:
-                process_video(video_id)
+                process_video(video_id, languages)
                 job_queue.update_job_status(job_id, "completed")
                 print(f"[INFO] ジョブが完了しました: {job_id}")
             except Exception as e: